@@ -0,0 +1,10 @@
+"""
+Shared paths for setup.py and summarize.py.
+"""
+
+from pathlib import Path
+
+# Credentials stored outside project directory (survives reinstall)
+CONFIG_DIR = Path.home() / ".config" / "tg-summarizer"
+ENV_FILE = CONFIG_DIR / ".env"
+SESSION_NAME = "tg_agent"
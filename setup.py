@@ -4,56 +4,173 @@ Interactive setup wizard for Telegram API credentials.
 Opens browser for API registration, collects credentials, and performs first login.
 """
 
+import functools
 import logging
 import os
 import sys
-import webbrowser
-from pathlib import Path
+
+from config import CONFIG_DIR, ENV_FILE, SESSION_NAME
+
+# Path strings computed once (pyrogram and os.scandir take plain strings)
+_CONFIG_DIR_STR = str(CONFIG_DIR)
+_ENV_FILE_STR = str(ENV_FILE)
+_SESSION_PATH_STR = os.path.join(_CONFIG_DIR_STR, SESSION_NAME)
+_SESSION_FILE_STR = _SESSION_PATH_STR + ".session"
 
 # Suppress Pyrogram banner and verbose output
 logging.getLogger("pyrogram").setLevel(logging.WARNING)
 
-from rich.console import Console
-from rich.panel import Panel
-from rich.prompt import Prompt, Confirm
+_DEFAULT_MODEL = "llama3.2"
+_ENV_MODEL = os.environ.get("OLLAMA_MODEL")  # set by install.sh after model selection
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+_CONFIG_DIR_READY = False
+
+# Static wizard text
+_API_APPS_URL = "https://my.telegram.org/apps"
+_DIVIDER = "=" * 40
+_HEADER = "\n[bold]TG Summarizer Setup[/bold]\n" + _DIVIDER
+_INSTRUCTIONS = (
+    "\n[dim]1. Log in with your phone number\n"
+    "2. Go to 'API development tools'\n"
+    "3. Create an app (any name works)\n"
+    "4. Copy api_id and api_hash below[/dim]\n"
+)
+
+_USAGE = "Usage: python setup.py [--api-id N --api-hash HASH]\n"
+
+# Pipes, CI and TG_SETUP_NONINTERACTIVE=1 skip the wizard UI
+INTERACTIVE = sys.stdin.isatty() and not os.environ.get("TG_SETUP_NONINTERACTIVE")
+
+_ENV_TEMPLATE = (
+    b"# Telegram API credentials\n"
+    b"API_ID=%b\n"
+    b"API_HASH=%b\n"
+    b"\n"
+    b"# LLM model (llama3.2, qwen2.5:7b, mistral)\n"
+    b"OLLAMA_MODEL=%b\n"
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _console():
+    """Shared Rich console, created on first use (rich is slow to import)."""
+    from rich.console import Console
+    return Console()
+
+
+def _ask(label: str) -> str:
+    """Prompt for a value: Rich prompt in the wizard, plain input() otherwise."""
+    if INTERACTIVE:
+        from rich.prompt import Prompt
+        return Prompt.ask(f"[bold]{label}[/bold]").strip()
+    return input(f"{label}: ").strip()
+
+
+def _confirm(question: str, default: bool = False) -> bool:
+    """Plain y/n prompt on stdin for fast paths that don't need Rich's Confirm."""
+    sys.stdout.write(f"{question} [{'Y/n' if default else 'y/N'}] ")
+    sys.stdout.flush()
+    answer = sys.stdin.readline().strip().lower()
+    return answer.startswith("y") if answer else default
+
+
+@functools.lru_cache(maxsize=None)
+def _panels():
+    """Wizard panels, with markup parsed once per process."""
+    from rich.panel import Panel
+    from rich.text import Text
+
+    return {
+        "credentials": Panel.fit(Text.from_markup(
+            "[bold cyan]Telegram API Credentials[/bold cyan]\n\n"
+            "To read your messages, we need API access.\n"
+            "You'll create an 'app' on Telegram's site\n"
+            "and copy two values: api_id and api_hash."
+        ), border_style="cyan"),
+        "login": Panel.fit(Text.from_markup(
+            "[bold cyan]Telegram Login[/bold cyan]\n\n"
+            "Now we'll authenticate with Telegram.\n"
+            "This uses the official MTProto API — same as\n"
+            "the desktop app. Your session stays local.\n\n"
+            "[green]All messages are processed locally.[/green]\n"
+            "[green]Nothing is sent to external servers.[/green]\n\n"
+            "[bold]What happens next:[/bold]\n"
+            "  1. Enter your phone number\n"
+            "  2. Telegram sends a code to your app\n"
+            "  3. Enter the code here\n"
+            "  4. If 2FA enabled — enter password (hidden)\n\n"
+            "[dim]Press Ctrl+C to cancel[/dim]"
+        ), border_style="cyan"),
+    }
+
+
+def _ensure_config_dir():
+    """Create CONFIG_DIR once per process."""
+    global _CONFIG_DIR_READY
+    if _CONFIG_DIR_READY:
+        return
+    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    _CONFIG_DIR_READY = True
+
 
-console = Console()
+def _open_url_async(url: str):
+    """Launch the system browser without waiting for it to start."""
+    if sys.platform == "win32":
+        os.startfile(url)
+        return
 
-# Store credentials outside project directory (survives reinstall)
-CONFIG_DIR = Path.home() / ".config" / "tg-summarizer"
-ENV_FILE = CONFIG_DIR / ".env"
-SESSION_NAME = "tg_agent"
+    import subprocess
+
+    opener = "open" if sys.platform == "darwin" else "xdg-open"
+    try:
+        subprocess.Popen(
+            [opener, url],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+    except FileNotFoundError:
+        # No desktop opener (e.g. minimal Linux) — let webbrowser find one
+        import webbrowser
+        webbrowser.open(url)
+
+
+def _write_env(payload: bytes):
+    """Atomically replace .env with payload (owner-only permissions, fsynced)."""
+    tmp = ENV_FILE.with_name(ENV_FILE.name + ".tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o600)
+    try:
+        view = memoryview(payload)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp, ENV_FILE)
 
 
 def setup_credentials():
     """Collect Telegram API credentials from user."""
-    console.print()
-    console.print(Panel.fit(
-        "[bold cyan]Telegram API Credentials[/bold cyan]\n\n"
-        "To read your messages, we need API access.\n"
-        "You'll create an 'app' on Telegram's site\n"
-        "and copy two values: api_id and api_hash.",
-        border_style="cyan"
-    ))
-    console.print()
+    from rich.prompt import Confirm
+
+    console = _console()
+    console.print("", _panels()["credentials"], "")
 
     # Open browser for API registration
-    if Confirm.ask("Open [link=https://my.telegram.org/apps]my.telegram.org/apps[/link] in browser?", default=True):
-        webbrowser.open("https://my.telegram.org/apps")
-        console.print()
-        console.print("[dim]1. Log in with your phone number[/dim]")
-        console.print("[dim]2. Go to 'API development tools'[/dim]")
-        console.print("[dim]3. Create an app (any name works)[/dim]")
-        console.print("[dim]4. Copy api_id and api_hash below[/dim]")
-        console.print()
+    if Confirm.ask(f"Open [link={_API_APPS_URL}]my.telegram.org/apps[/link] in browser?", default=True):
+        _open_url_async(_API_APPS_URL)
+        console.print(_INSTRUCTIONS)
 
     # Collect credentials
-    api_id = Prompt.ask("[bold]api_id[/bold]").strip()
-    api_hash = Prompt.ask("[bold]api_hash[/bold]").strip()
+    api_id = _ask("api_id")
+    api_hash = _ask("api_hash")
 
     # Validate
-    if not api_id.isdigit():
-        console.print("[red]Error: api_id should be a number[/red]")
+    error = _credentials_error(api_id, api_hash)
+    if error:
+        console.print(f"[red]Error: {error}[/red]")
         sys.exit(1)
 
     if len(api_hash) != 32:
@@ -61,80 +178,111 @@ def setup_credentials():
         if not Confirm.ask("Continue anyway?", default=False):
             sys.exit(1)
 
-    # Save to .env (use model from environment or default)
-    model = os.getenv("OLLAMA_MODEL", "llama3.2")
-    env_content = f"""# Telegram API credentials
-API_ID={api_id}
-API_HASH={api_hash}
-
-# LLM model (llama3.2, qwen2.5:7b, mistral)
-OLLAMA_MODEL={model}
-"""
-    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-    ENV_FILE.write_text(env_content)
-    console.print(f"[green]Saved to {ENV_FILE}[/green]")
+    save_credentials(api_id, api_hash)
+    console.print(f"[green]Saved to {_ENV_FILE_STR}[/green]")
 
     return api_id, api_hash
 
 
-def telegram_login(api_id: str, api_hash: str):
+def _credentials_error(api_id: str, api_hash: str):
+    """Return an error message for malformed credentials, or None if they look valid."""
+    if not (api_id.isascii() and api_id.isdigit()):
+        return "api_id should be a number"
+    if not _HEX_DIGITS.issuperset(api_hash):
+        return "api_hash should contain only hex characters (0-9, a-f)"
+    return None
+
+
+def save_credentials(api_id: str, api_hash: str):
+    """Write credentials to .env."""
+    # Model from environment, else keep the configured one
+    model = _ENV_MODEL or _read_env().get("OLLAMA_MODEL") or _DEFAULT_MODEL
+    payload = _ENV_TEMPLATE % (api_id.encode(), api_hash.encode(), model.encode())
+    _ensure_config_dir()
+    _write_env(payload)
+
+
+def telegram_login(api_id: str, api_hash: str, intro: bool = True):
     """Perform first Telegram login to create session."""
-    console.print()
-    console.print(Panel.fit(
-        "[bold cyan]Telegram Login[/bold cyan]\n\n"
-        "Now we'll authenticate with Telegram.\n"
-        "This uses the official MTProto API — same as\n"
-        "the desktop app. Your session stays local.\n\n"
-        "[green]All messages are processed locally.[/green]\n"
-        "[green]Nothing is sent to external servers.[/green]\n\n"
-        "[bold]What happens next:[/bold]\n"
-        "  1. Enter your phone number\n"
-        "  2. Telegram sends a code to your app\n"
-        "  3. Enter the code here\n"
-        "  4. If 2FA enabled — enter password (hidden)\n\n"
-        "[dim]Press Ctrl+C to cancel[/dim]",
-        border_style="cyan"
-    ))
-    console.print()
+    console = _console()
+    if intro:
+        console.print("", _panels()["login"], "")
 
     # Import pyrogram here to avoid import errors if not installed
+    # (on the main thread: pyrogram's sync wrapper binds to this thread's event loop)
     try:
         from pyrogram import Client
     except ImportError:
         console.print("[red]Error: pyrogram not installed. Run: pip install pyrogram tgcrypto[/red]")
         sys.exit(1)
 
-    session_path = CONFIG_DIR / SESSION_NAME
-    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+    api_id_int = int(api_id)
+    _ensure_config_dir()
 
     try:
         # Create client (Pyrogram uses getpass internally for 2FA)
         with Client(
-            name=str(session_path),
-            api_id=int(api_id),
+            name=_SESSION_PATH_STR,
+            api_id=api_id_int,
             api_hash=api_hash,
-            workdir=str(CONFIG_DIR),
+            workdir=_CONFIG_DIR_STR,
             hide_password=True  # Hide 2FA password input
         ) as app:
-            me = app.get_me()
-            console.print()
-            console.print(f"[green]Logged in as {me.first_name} (@{me.username or 'no username'})[/green]")
-            console.print("[dim]Session saved[/dim]")
+            # start() has already fetched the current user
+            me = app.me
     except KeyboardInterrupt:
         console.print("\n[yellow]Cancelled.[/yellow]")
         sys.exit(0)
 
+    console.print(
+        f"\n[green]Logged in as {me.first_name} (@{me.username or 'no username'})[/green]\n"
+        "[dim]Session saved[/dim]"
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _parse_env(raw: bytes) -> dict:
+    """Parse KEY=value lines from .env contents (cached per file contents).
+
+    Follows python-dotenv, which summarize.py uses on the same file: an
+    optional "export " prefix, quoted values, and " #" comments after
+    unquoted values.
+    """
+    values = {}
+
+    for line in raw.decode("utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, value = line.split("=", 1)
+        key = key.strip()
+        if key.startswith("export "):
+            key = key[len("export "):].strip()
+        value = value.strip()
+        quote = value[:1]
+        if quote in ("'", '"') and quote in value[1:]:
+            value = value[1:value.index(quote, 1)]
+        else:
+            value = value.split(" #", 1)[0].rstrip()
+        values[key] = value
+
+    return values
+
+
+def _read_env() -> dict:
+    """Read .env into a dict (empty if the file does not exist)."""
+    try:
+        raw = ENV_FILE.read_bytes()
+    except FileNotFoundError:
+        return {}
+    return _parse_env(raw)
+
 
 def get_existing_credentials():
     """Check if valid credentials exist in .env file."""
-    if not ENV_FILE.exists():
-        return None, None
-
-    from dotenv import load_dotenv
-    load_dotenv(ENV_FILE)
-
-    api_id = os.getenv("API_ID")
-    api_hash = os.getenv("API_HASH")
+    env = _read_env()
+    api_id = env.get("API_ID")
+    api_hash = env.get("API_HASH")
 
     if api_id and api_hash and api_id != "your_api_id_here":
         return api_id, api_hash
@@ -142,27 +290,111 @@ def get_existing_credentials():
     return None, None
 
 
+def _probe_config_dir():
+    """Return (have_env, have_session) from a single read of CONFIG_DIR."""
+    have_env = have_session = False
+    session_name = f"{SESSION_NAME}.session"
+
+    try:
+        entries = os.scandir(_CONFIG_DIR_STR)
+    except FileNotFoundError:
+        return False, False
+
+    with entries as it:
+        for entry in it:
+            if entry.name == ENV_FILE.name:
+                have_env = True
+            elif entry.name == session_name:
+                have_session = True
+
+    return have_env, have_session
+
+
+def _parse_args(argv: list):
+    """Read --api-id/--api-hash (or --api-id=N) from argv."""
+    values = {}
+    args = iter(argv)
+
+    for arg in args:
+        name, sep, value = arg.partition("=")
+        if name in ("-h", "--help"):
+            sys.stdout.write(_USAGE)
+            sys.exit(0)
+        if name not in ("--api-id", "--api-hash"):
+            sys.stderr.write(f"Unknown argument: {arg}\n{_USAGE}")
+            sys.exit(2)
+        value = value if sep else next(args, "")
+        if not value or value.startswith("--"):
+            sys.stderr.write(f"Missing value for {name}\n{_USAGE}")
+            sys.exit(2)
+        values[name] = value
+
+    return values.get("--api-id"), values.get("--api-hash")
+
+
+def _main_non_interactive(argv: list):
+    """Configure from argv/environment without any wizard UI."""
+    api_id, api_hash = _parse_args(argv)
+    api_id = api_id or os.environ.get("API_ID")
+    api_hash = api_hash or os.environ.get("API_HASH")
+
+    have_env, have_session = _probe_config_dir()
+    saved_id, saved_hash = get_existing_credentials() if have_env else (None, None)
+
+    # Each value separately: argv, then environment, then .env, then stdin (e.g. piped in CI)
+    api_id = api_id or saved_id
+    api_hash = api_hash or saved_hash
+    try:
+        api_id = api_id or _ask("api_id")
+        api_hash = api_hash or _ask("api_hash")
+    except EOFError:
+        api_id = api_hash = None
+    if not (api_id and api_hash):
+        sys.stderr.write("\nError: API_ID/API_HASH not set. Pass --api-id/--api-hash or set them in the environment.\n")
+        sys.exit(1)
+
+    if (api_id, api_hash) != (saved_id, saved_hash):
+        error = _credentials_error(api_id, api_hash)
+        if error:
+            sys.stderr.write(f"Error: {error}\n")
+            sys.exit(1)
+        save_credentials(api_id, api_hash)
+
+    # Fully configured — nothing to do
+    if have_session:
+        return
+
+    telegram_login(api_id, api_hash, intro=False)
+
+
 def main():
-    console.print()
-    console.print("[bold]TG Summarizer Setup[/bold]")
-    console.print("=" * 40)
+    if not INTERACTIVE or len(sys.argv) > 1:
+        _main_non_interactive(sys.argv[1:])
+        return
+
+    console = _console()
+    console.print(_HEADER)
 
-    session_file = CONFIG_DIR / f"{SESSION_NAME}.session"
-    api_id, api_hash = get_existing_credentials()
+    have_env, have_session = _probe_config_dir()
+    api_id, api_hash = get_existing_credentials() if have_env else (None, None)
 
     # Case 1: Fully configured (credentials + session)
-    if api_id and api_hash and session_file.exists():
-        console.print(f"[dim]Found credentials: {ENV_FILE}[/dim]")
-        console.print(f"[dim]Found session: {session_file}[/dim]")
-        if not Confirm.ask("Reconfigure?", default=False):
+    if api_id and api_hash and have_session:
+        console.print(
+            f"[dim]Found credentials: {_ENV_FILE_STR}\n"
+            f"Found session: {_SESSION_FILE_STR}[/dim]"
+        )
+        if not _confirm("Reconfigure?", default=False):
             return
         # User wants to reconfigure — get new credentials
         api_id, api_hash = setup_credentials()
 
     # Case 2: Have credentials but no session — just need to login
     elif api_id and api_hash:
-        console.print(f"[dim]Found credentials: {ENV_FILE}[/dim]")
-        console.print("[dim]Session not found, need to login.[/dim]")
+        console.print(
+            f"[dim]Found credentials: {_ENV_FILE_STR}\n"
+            "Session not found, need to login.[/dim]"
+        )
 
     # Case 3: No credentials — full setup
     else:
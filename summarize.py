@@ -8,35 +8,52 @@ Usage:
     python summarize.py --chat "Work"     # Summarize specific chat
 """
 
+from __future__ import annotations
+
 import argparse
+import functools
+import hashlib
 import os
+import re
 import sys
 import time
-from collections import defaultdict
-from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, List, Optional, Tuple
 
 from dotenv import load_dotenv
-from rich.console import Console
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.tree import Tree
 
-# Credentials stored outside project directory (survives reinstall)
-CONFIG_DIR = Path.home() / ".config" / "tg-summarizer"
-ENV_FILE = CONFIG_DIR / ".env"
+from config import CONFIG_DIR, ENV_FILE, SESSION_NAME
 
 # Load environment
 load_dotenv(ENV_FILE)
 
-console = Console()
-
 # Constants
-SESSION_NAME = "tg_agent"
 DEFAULT_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2")
-MAX_CONTEXT_CHARS = 6000  # Safe limit for most models (~1500 tokens)
+OLLAMA_NUM_CTX = 4096  # Context window requested from Ollama
+PROMPT_RESERVE_TOKENS = 1280  # Instructions, chat header and the model's answer
+MAX_CONTEXT_TOKENS = OLLAMA_NUM_CTX - PROMPT_RESERVE_TOKENS  # Messages per chunk
 DEFAULT_MAX_CHATS = 5  # Limit chats to avoid overwhelming LLM
 DEFAULT_MAX_MESSAGES = 100  # Total messages limit for summarization
+# Replies that carry no content on their own; folded into one counted line
+TRIVIAL_MESSAGES = frozenset({
+    "ok", "ок", "окей", "+", "+1", "👍", "👌", "🙏", "❤️", "🔥", "да", "нет", "ага", "угу",
+    "ясно", "понял", "поняла", "спасибо", "спс", "thanks", "thx", "yes", "no",
+})
+UNREAD_DIALOG_OVERSAMPLE = 4  # Dialogs scanned per requested chat in --unread mode
+DEFAULT_MAX_PARALLEL = 2  # Concurrent Ollama requests (server queues the rest)
+OLLAMA_KEEP_ALIVE = "30m"  # Keep the model loaded between chunks, chats and runs
+# Sent with every request: a different num_ctx makes Ollama reload the model
+OLLAMA_OPTIONS = {"num_ctx": OLLAMA_NUM_CTX}
+CACHE_FILE = CONFIG_DIR / "cache.sqlite"  # Summaries keyed by model + messages
+CACHE_TTL = 24 * 60 * 60  # Seconds a cached summary stays valid after its last use
+CACHE_MAX_ENTRIES = 500
+_BULLET = re.compile(r"^[-*•]\s+")  # Bullet markers stripped from summary lines
+
+
+@functools.lru_cache(maxsize=None)
+def _console():
+    """Shared Rich console, created on first use (rich is slow to import)."""
+    from rich.console import Console
+    return Console()
 
 
 def check_setup():
@@ -45,12 +62,14 @@ def check_setup():
     api_hash = os.getenv("API_HASH")
 
     if not api_id or not api_hash or api_id == "your_api_id_here":
+        console = _console()
         console.print("[red]Error: Telegram API not configured.[/red]")
         console.print("Run: [cyan]python setup.py[/cyan]")
         sys.exit(1)
 
     session_file = CONFIG_DIR / f"{SESSION_NAME}.session"
     if not session_file.exists():
+        console = _console()
         console.print("[red]Error: Telegram session not found.[/red]")
         console.print("Run: [cyan]python setup.py[/cyan]")
         sys.exit(1)
@@ -65,6 +84,7 @@ def check_ollama():
         ollama.list()
         return True
     except Exception as e:
+        console = _console()
         console.print(f"[red]Error: Cannot connect to Ollama.[/red]")
         console.print("[dim]Make sure Ollama is running: ollama serve[/dim]")
         console.print(f"[dim]Error: {e}[/dim]")
@@ -84,86 +104,176 @@ def get_telegram_client(api_id: str, api_hash: str):
     )
 
 
-def fetch_unread_messages(client, max_chats: int = DEFAULT_MAX_CHATS, max_messages: int = DEFAULT_MAX_MESSAGES) -> dict:
-    """Fetch unread messages grouped by chat."""
-    messages_by_chat = defaultdict(list)
-    chats_processed = 0
-    total_messages = 0
-
-    for dialog in client.get_dialogs():
-        if dialog.unread_messages_count > 0:
-            if chats_processed >= max_chats or total_messages >= max_messages:
-                break
-
-            chat_name = dialog.chat.title or dialog.chat.first_name or "Unknown"
-
-            # Fetch unread messages (limit per chat and total)
-            remaining = max_messages - total_messages
-            count = min(dialog.unread_messages_count, 50, remaining)
-            for msg in client.get_chat_history(dialog.chat.id, limit=count):
-                if msg.text:
-                    sender = ""
-                    if msg.from_user:
-                        sender = msg.from_user.first_name or msg.from_user.username or ""
-                    messages_by_chat[chat_name].append({
-                        "sender": sender,
-                        "text": msg.text,
-                        "date": msg.date
-                    })
-                    total_messages += 1
-                    if total_messages >= max_messages:
-                        break
-
-            chats_processed += 1
-
-    return dict(messages_by_chat)
-
-
-def fetch_last_messages(client, limit: int, chat_filter: Optional[str] = None) -> dict:
-    """Fetch last N messages, optionally filtered by chat name."""
-    messages_by_chat = defaultdict(list)
+def _chat_name(dialog) -> str:
+    """Display name of a dialog's chat."""
+    chat = dialog.chat
+    return chat.title or chat.first_name or "Unknown"
+
+
+async def collect_chat(client, chat_id, limit: int) -> list:
+    """Read the last `limit` messages of a chat, keeping text messages only."""
+    messages = []
+
+    async for msg in client.get_chat_history(chat_id, limit=limit):
+        if msg.text:
+            sender = ""
+            user = msg.from_user
+            if user:
+                sender = user.first_name or user.username or ""
+            messages.append({
+                "sender": sender,
+                "text": msg.text,
+                "date": msg.date
+            })
+
+    return messages
+
+
+async def fetch_unread_messages(client, max_chats: int = DEFAULT_MAX_CHATS, max_messages: int = DEFAULT_MAX_MESSAGES) -> AsyncIterator[Tuple[str, List[dict]]]:
+    """Yield (chat_name, messages) for chats with unread messages, busiest chats first."""
+    import asyncio
+
+    # Most dialogs have nothing unread, so scan a few times more than max_chats
+    dialogs = [
+        dialog async for dialog in client.get_dialogs(limit=max_chats * UNREAD_DIALOG_OVERSAMPLE)
+        if dialog.unread_messages_count > 0
+    ]
+
+    # Busiest chats first; pick chats and per-chat limits, then read histories concurrently
+    dialogs.sort(key=lambda d: d.unread_messages_count, reverse=True)
+    selected = []
+    planned = 0
+
+    for dialog in dialogs[:max_chats]:
+        if planned >= max_messages:
+            break
+        count = min(dialog.unread_messages_count, 50, max_messages - planned)
+        selected.append((_chat_name(dialog), dialog.chat.id, count))
+        planned += count
+
+    tasks = [
+        asyncio.ensure_future(collect_chat(client, chat_id, count))
+        for _, chat_id, count in selected
+    ]
+
+    try:
+        # Yield in selection order; later chats keep downloading meanwhile
+        for (chat_name, _, _), task in zip(selected, tasks):
+            messages = await task
+            if messages:
+                yield chat_name, messages
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def fetch_last_messages(client, limit: int, chat_filter: Optional[str] = None) -> AsyncIterator[Tuple[str, List[dict]]]:
+    """Yield (chat_name, messages) for the last N messages, optionally filtered by chat name."""
     total_fetched = 0
 
-    for dialog in client.get_dialogs():
+    # Sequential: each chat's budget depends on what earlier chats returned
+    async for dialog in client.get_dialogs():
         if total_fetched >= limit:
             break
 
-        chat_name = dialog.chat.title or dialog.chat.first_name or "Unknown"
+        chat_name = _chat_name(dialog)
 
         # Filter by chat name if specified
         if chat_filter and chat_filter.lower() not in chat_name.lower():
             continue
 
-        remaining = limit - total_fetched
-        for msg in client.get_chat_history(dialog.chat.id, limit=remaining):
-            if msg.text:
-                sender = ""
-                if msg.from_user:
-                    sender = msg.from_user.first_name or msg.from_user.username or ""
-                messages_by_chat[chat_name].append({
-                    "sender": sender,
-                    "text": msg.text,
-                    "date": msg.date
-                })
-                total_fetched += 1
+        messages = await collect_chat(client, dialog.chat.id, limit - total_fetched)
+        total_fetched += len(messages)
+
+        if messages:
+            yield chat_name, messages
+
+
+def compact_messages(messages: list) -> list:
+    """Shrink LLM input without losing content.
+
+    Drops repeated texts (forwards, copy-pastes), folds each run of adjacent
+    trivial replies ("ok", "+1", "👍", ...) into one line per reply with a
+    count, so answers stay next to what they answer, and merges
+    consecutive messages from the same sender into entries of at most a
+    quarter of the chunk budget. Input dicts are not modified.
+    """
+    compacted = []
+    seen = set()
+    acks = {}  # normalized reply -> (index in compacted, senders, count) in the current run
+
+    def fold_acks():
+        for norm, (index, senders, count) in acks.items():
+            compacted[index] = {
+                "sender": ", ".join(senders),
+                "text": f"{norm} ×{count[0]}" if count[0] > 1 else norm,
+                "date": None
+            }
+        acks.clear()
+
+    for msg in messages:
+        text = msg['text'].strip()
+        norm = text.lower()
+
+        if norm in TRIVIAL_MESSAGES:
+            if norm not in acks:
+                acks[norm] = (len(compacted), [], [0])
+                compacted.append(None)  # filled in below
+            _, senders, count = acks[norm]
+            if msg['sender'] and msg['sender'] not in senders:
+                senders.append(msg['sender'])
+            count[0] += 1
+            continue
+
+        if norm in seen:
+            continue
+        seen.add(norm)
+
+        prev = compacted[-1] if compacted else None  # None right after a run of replies
+        fold_acks()
+        if prev is not None and msg['sender'] and prev['sender'] == msg['sender']:
+            merged = f"{prev['text']}\n  {text}"
+            # Keep merged entries small enough for chunk_messages to split between them
+            if estimate_tokens(merged) <= MAX_CONTEXT_TOKENS // 4:
+                compacted[-1] = {"sender": prev['sender'], "text": merged, "date": prev.get('date')}
+                continue
+        compacted.append(msg)
+
+    fold_acks()
+    return compacted
 
-                if total_fetched >= limit:
-                    break
 
-    return dict(messages_by_chat)
+def message_line(msg: dict) -> str:
+    """LLM input line for a message, formatted once and cached on the dict."""
+    line = msg.get('_line')
+    if line is None:
+        sender, text = msg['sender'], msg['text']
+        line = msg['_line'] = f"- {sender}: {text}" if sender else f"- {text}"
+    return line
 
 
-def chunk_messages(messages: list, max_chars: int = MAX_CONTEXT_CHARS) -> list:
+def estimate_tokens(text: str) -> int:
+    """Conservative token count: 4 ASCII characters or 2 Cyrillic ones per token.
+
+    Characters beyond two UTF-8 bytes (CJK, emoji) count as 1-1.5 tokens each.
+    Overestimating is the safe side: Ollama silently drops the start of an
+    oversized prompt, instructions included.
+    """
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    extra_bytes = len(text.encode()) - len(text)
+    return (ascii_chars + 2 * extra_bytes) // 4 + 1
+
+
+def chunk_messages(messages: list, max_tokens: int = MAX_CONTEXT_TOKENS) -> list:
     """Split messages into chunks that fit within context window."""
     chunks = []
     current_chunk = []
     current_size = 0
 
     for msg in messages:
-        msg_text = f"{msg['sender']}: {msg['text']}" if msg['sender'] else msg['text']
-        msg_size = len(msg_text)
+        msg_size = estimate_tokens(message_line(msg))
 
-        if current_size + msg_size > max_chars and current_chunk:
+        if current_size + msg_size > max_tokens and current_chunk:
             chunks.append(current_chunk)
             current_chunk = []
             current_size = 0
@@ -179,22 +289,18 @@ def chunk_messages(messages: list, max_chars: int = MAX_CONTEXT_CHARS) -> list:
 
 def format_messages_for_llm(messages: list, chat_name: str) -> str:
     """Format messages for LLM input."""
-    lines = [f"Chat: {chat_name}", "Messages:"]
+    def lines():
+        yield f"Chat: {chat_name}"
+        yield "Messages:"
+        for msg in messages:
+            yield message_line(msg)
 
-    for msg in messages:
-        if msg['sender']:
-            lines.append(f"- {msg['sender']}: {msg['text']}")
-        else:
-            lines.append(f"- {msg['text']}")
+    return "\n".join(lines())
 
-    return "\n".join(lines)
 
-
-def summarize_with_ollama(text: str, model: str) -> str:
-    """Send text to Ollama for summarization."""
-    import ollama
-
-    prompt = f"""Summarize the following Telegram chat messages in Russian.
+def build_prompt(text: str) -> str:
+    """Build the summarization prompt for one chunk of formatted messages."""
+    return f"""Summarize the following Telegram chat messages in Russian.
 Be concise and focus on key points, action items, and important information.
 Use bullet points. Keep the summary short (3-5 bullet points max).
 
@@ -202,37 +308,182 @@ Use bullet points. Keep the summary short (3-5 bullet points max).
 
 Summary:"""
 
-    response = ollama.generate(model=model, prompt=prompt)
-    return response['response'].strip()
+
+def build_merge_prompt(summaries: list) -> str:
+    """Build the prompt that combines per-chunk summaries into one."""
+    combined = "\n\n".join(summaries)
+    return f"""Combine these summaries into one concise summary in Russian:
+
+{combined}
+
+Final summary:"""
 
 
-def summarize_chat(chat_name: str, messages: list, model: str) -> list:
+def open_cache(path=CACHE_FILE):
+    """Open the summary cache, dropping expired entries (None if unavailable)."""
+    import sqlite3
+
+    try:
+        # Summaries of private chats: create the file readable by the owner only
+        os.close(os.open(str(path), os.O_CREAT | os.O_WRONLY, 0o600))
+        conn = sqlite3.connect(str(path))
+        conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, summary TEXT, ts REAL)")
+        conn.execute("DELETE FROM cache WHERE ts < ?", (time.time() - CACHE_TTL,))
+        conn.commit()
+    except (OSError, sqlite3.Error):
+        return None
+    return conn
+
+
+def cache_key(prompt: str, model: str) -> str:
+    """Content-addressed key: same model and same messages give the same key."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(model.encode())
+    digest.update(b"\0")
+    digest.update(prompt.encode())
+    return digest.hexdigest()
+
+
+def cache_get(conn, key: str) -> Optional[str]:
+    """Return a summary used within the last CACHE_TTL seconds, or None."""
+    if conn is None:
+        return None
+    now = time.time()
+    row = conn.execute(
+        "SELECT summary FROM cache WHERE key = ? AND ts >= ?",
+        (key, now - CACHE_TTL)
+    ).fetchone()
+    if row is None:
+        return None
+    # Refresh on use, so cache_put evicts the least recently used entries
+    conn.execute("UPDATE cache SET ts = ? WHERE key = ?", (now, key))
+    conn.commit()
+    return row[0]
+
+
+def cache_put(conn, key: str, summary: str):
+    """Store a summary, evicting the oldest entries beyond CACHE_MAX_ENTRIES."""
+    if conn is None:
+        return
+    conn.execute("INSERT OR REPLACE INTO cache (key, summary, ts) VALUES (?, ?, ?)", (key, summary, time.time()))
+    conn.execute(
+        "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY ts DESC LIMIT -1 OFFSET ?)",
+        (CACHE_MAX_ENTRIES,)
+    )
+    conn.commit()
+
+
+async def warm_up(client, model: str):
+    """Load the model into Ollama's memory (an empty prompt only loads it)."""
+    try:
+        await client.generate(model=model, prompt="", keep_alive=OLLAMA_KEEP_ALIVE, options=OLLAMA_OPTIONS)
+    except Exception:
+        pass  # The first real request loads it anyway and reports errors
+
+
+async def summarize_with_ollama(client, prompt: str, model: str, limit: asyncio.Semaphore, cache=None, on_stream=None) -> str:
+    """Send a prompt to Ollama and return the generated text (served from cache if possible).
+
+    The response is streamed; on_stream, if given, receives the text generated so far.
+    """
+    key = cache_key(prompt, model)
+    cached = cache_get(cache, key)
+    if cached is not None:
+        return cached
+
+    text = ""
+    async with limit:
+        stream = await client.generate(
+            model=model,
+            prompt=prompt,
+            stream=True,
+            keep_alive=OLLAMA_KEEP_ALIVE,
+            options=OLLAMA_OPTIONS
+        )
+        async for part in stream:
+            text += part['response']
+            if on_stream:
+                on_stream(text)
+    summary = text.strip()
+
+    cache_put(cache, key, summary)
+    return summary
+
+
+async def summarize_chat(client, chat_name: str, messages: list, model: str, limit: asyncio.Semaphore, cache=None, on_stream=None) -> list:
     """Summarize messages from a single chat, handling chunking if needed."""
-    chunks = chunk_messages(messages)
-    summaries = []
+    import asyncio
 
-    for chunk in chunks:
-        text = format_messages_for_llm(chunk, chat_name)
-        summary = summarize_with_ollama(text, model)
-        summaries.append(summary)
+    chunks = chunk_messages(compact_messages(messages))
+    prompts = [build_prompt(format_messages_for_llm(chunk, chat_name)) for chunk in chunks]
 
-    # If multiple chunks, combine summaries
-    if len(summaries) > 1:
-        combined = "\n\n".join(summaries)
-        final_prompt = f"""Combine these summaries into one concise summary in Russian:
+    # Submit every chunk at once; Ollama has no list-of-prompts endpoint
+    summaries = await asyncio.gather(*[
+        summarize_with_ollama(client, prompt, model, limit, cache, on_stream) for prompt in prompts
+    ])
 
-{combined}
+    # If multiple chunks produced a long result, combine summaries; short ones are just joined
+    if len(summaries) > 1 and sum(estimate_tokens(s) for s in summaries) > MAX_CONTEXT_TOKENS // 2:
+        return [await summarize_with_ollama(client, build_merge_prompt(summaries), model, limit, cache, on_stream)]
 
-Final summary:"""
-        import ollama
-        response = ollama.generate(model=model, prompt=final_prompt)
-        return [response['response'].strip()]
+    return ["\n\n".join(summaries)]
+
+
+async def summarize_all(chats: AsyncIterator[Tuple[str, List[dict]]], model: str, max_parallel: int, on_fetched=None, on_done=None, cache=None, on_stream=None) -> dict:
+    """Summarize chats from an async iterable of (chat_name, messages) as they arrive.
+
+    Each chat is handed to Ollama as soon as it is fetched, so reading from
+    Telegram overlaps with summarization. At most max_parallel Ollama
+    requests are in flight.
+    """
+    import asyncio
+    import ollama
 
-    return summaries
+    # One client for every request, so the connection to Ollama is kept alive and reused
+    client = ollama.AsyncClient()
+    limit = asyncio.Semaphore(max_parallel)
+
+    async def run(chat_name: str, messages: list):
+        stream = (lambda text: on_stream(chat_name, text)) if on_stream else None
+        summaries = await summarize_chat(client, chat_name, messages, model, limit, cache, stream)
+        if on_done:
+            on_done(chat_name)
+        return chat_name, {
+            "count": len(messages),
+            "summary": "\n".join(summaries)
+        }
+
+    # Closing the client on exit releases its pooled HTTP connections
+    async with client:
+        # Load the model while Telegram is still being read
+        warmup = asyncio.ensure_future(warm_up(client, model))
+        tasks = []
+        try:
+            async for chat_name, messages in chats:
+                tasks.append(asyncio.ensure_future(run(chat_name, messages)))
+                if on_fetched:
+                    on_fetched(chat_name, messages)
+            if not tasks:
+                # Nothing to summarize — don't wait for (or keep) the model
+                warmup.cancel()
+                return {}
+            # gather() keeps results in fetch order regardless of completion order
+            results = dict(await asyncio.gather(*tasks))
+            await warmup
+            return results
+        except BaseException:
+            warmup.cancel()
+            for task in tasks:
+                task.cancel()
+            raise
 
 
 def display_results(results: dict, model: str, elapsed: float):
     """Display summarization results with rich formatting."""
+    from rich.panel import Panel
+    from rich.tree import Tree
+
+    console = _console()
     total_messages = sum(r['count'] for r in results.values())
     total_chats = len(results)
 
@@ -253,12 +504,7 @@ def display_results(results: dict, model: str, elapsed: float):
             line = line.strip()
             if line and not line.startswith('Summary'):
                 # Clean up bullet points
-                if line.startswith('- '):
-                    line = line[2:]
-                elif line.startswith('* '):
-                    line = line[2:]
-                elif line.startswith('• '):
-                    line = line[2:]
+                line = _BULLET.sub('', line, count=1)
 
                 if line:
                     tree.add(f"[dim]{line}[/dim]")
@@ -281,6 +527,7 @@ Examples:
   python summarize.py --last 100                Summarize last 100 messages
   python summarize.py --chat "Work" --last 50   Summarize specific chat
   python summarize.py --unread --model mistral  Use different model
+  python summarize.py --unread --parallel 4     More concurrent LLM requests
         """
     )
 
@@ -326,58 +573,68 @@ Examples:
         metavar="N",
         help=f"Max total messages to summarize (default: {DEFAULT_MAX_MESSAGES})"
     )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=DEFAULT_MAX_PARALLEL,
+        metavar="N",
+        help=f"Max concurrent Ollama requests (default: {DEFAULT_MAX_PARALLEL})"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Don't use the summary cache (always ask the LLM)"
+    )
 
     args = parser.parse_args()
 
     # Validate arguments
     if not args.unread and not args.last and not args.list_chats:
         parser.print_help()
-        console.print("\n[yellow]Specify --unread or --last N[/yellow]")
+        _console().print("\n[yellow]Specify --unread or --last N[/yellow]")
         sys.exit(1)
 
-    # Check setup
+    if args.parallel < 1:
+        parser.error("--parallel must be at least 1")
+
+    # Check setup (listing chats doesn't need the LLM)
     api_id, api_hash = check_setup()
-    check_ollama()
+    if not args.list_chats:
+        check_ollama()
+
+    # asyncio is slow to import, so --help and argument errors skip it
+    import asyncio
+    asyncio.run(run(args, api_id, api_hash))
 
-    # Create client
+
+async def run(args, api_id: str, api_hash: str):
+    """Fetch messages and summarize them, overlapping Telegram reads with LLM calls."""
+    from rich.markup import escape
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+
+    console = _console()
+
+    # Create client (inside the event loop — Pyrogram binds to the current loop)
     client = get_telegram_client(api_id, api_hash)
 
-    with client:
+    async with client:
         # List chats mode
         if args.list_chats:
             console.print("\n[bold]Available chats:[/bold]\n")
-            for dialog in client.get_dialogs(limit=50):
-                name = dialog.chat.title or dialog.chat.first_name or "Unknown"
+            async for dialog in client.get_dialogs(limit=50):
                 unread = f" ({dialog.unread_messages_count} unread)" if dialog.unread_messages_count else ""
-                console.print(f"  {name}{unread}")
-            return
-
-        # Fetch messages
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            console=console,
-            transient=True
-        ) as progress:
-            progress.add_task("Reading messages from Telegram...", total=None)
-
-            if args.unread:
-                messages_by_chat = fetch_unread_messages(client, args.max_chats, args.max_messages)
-            else:
-                limit = min(args.last, args.max_messages)
-                messages_by_chat = fetch_last_messages(client, limit, args.chat)
-
-        if not messages_by_chat:
-            console.print("[yellow]No messages found.[/yellow]")
+                console.print(f"  {_chat_name(dialog)}{unread}")
             return
 
-        # Show what we found
-        total = sum(len(msgs) for msgs in messages_by_chat.values())
-        console.print(f"[dim]Found {total} messages in {len(messages_by_chat)} chats[/dim]")
+        if args.unread:
+            chats = fetch_unread_messages(client, args.max_chats, args.max_messages)
+        else:
+            limit = min(args.last, args.max_messages)
+            chats = fetch_last_messages(client, limit, args.chat)
 
-        # Summarize each chat
-        results = {}
+        # Summarize each chat as soon as it has been read
         start_time = time.time()
+        fetched = [0, 0]  # chats, messages
 
         with Progress(
             SpinnerColumn(),
@@ -385,21 +642,36 @@ Examples:
             console=console,
             transient=True
         ) as progress:
-            task = progress.add_task("Summarizing...", total=len(messages_by_chat))
+            task = progress.add_task("Reading messages from Telegram...", total=None)
 
-            for chat_name, messages in messages_by_chat.items():
-                progress.update(task, description=f"Summarizing {chat_name}...")
+            def on_fetched(chat_name: str, messages: list):
+                fetched[0] += 1
+                fetched[1] += len(messages)
+                progress.update(task, description=f"Reading messages, summarizing {chat_name}...")
 
-                summaries = summarize_chat(chat_name, messages, args.model)
-                results[chat_name] = {
-                    "count": len(messages),
-                    "summary": "\n".join(summaries)
-                }
+            def on_done(chat_name: str):
+                progress.update(task, description=f"Summarized {chat_name}...")
 
-                progress.advance(task)
+            def on_stream(chat_name: str, text: str):
+                # Show the tail of the line being generated
+                tail = text[-60:].rsplit("\n", 1)[-1]
+                progress.update(task, description=f"{chat_name}: [dim]{escape(tail)}[/dim]")
+
+            cache = None if args.no_cache else open_cache()
+            try:
+                results = await summarize_all(chats, args.model, args.parallel, on_fetched, on_done, cache, on_stream)
+            finally:
+                if cache is not None:
+                    cache.close()
 
         elapsed = time.time() - start_time
 
+        if not results:
+            console.print("[yellow]No messages found.[/yellow]")
+            return
+
+        console.print(f"[dim]Found {fetched[1]} messages in {fetched[0]} chats[/dim]")
+
         # Display results
         display_results(results, args.model, elapsed)
 
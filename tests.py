@@ -155,8 +155,8 @@ def test_chunking():
         {"sender": "Charlie", "text": "Test " * 100}, # ~500 chars
     ]
 
-    # Test with small max_chars to force chunking
-    chunks = chunk_messages(messages, max_chars=700)
+    # Test with small max_tokens to force chunking
+    chunks = chunk_messages(messages, max_tokens=175)
 
     if len(chunks) >= 2:
         console.print(f"  [green]✓[/green] Chunking works ({len(chunks)} chunks created)")
@@ -188,6 +188,161 @@ def test_format_messages():
         return False
 
 
+def test_compact_messages():
+    """Test dedup and folding of messages before they reach the LLM."""
+    console.print("[bold]Test: Message compaction[/bold]")
+
+    from summarize import compact_messages
+
+    messages = [
+        {"sender": "Alice", "text": "Release is on Friday"},
+        {"sender": "Alice", "text": "Please review PR #234"},
+        {"sender": "Bob", "text": "+1"},
+        {"sender": "Carol", "text": "+1"},
+        {"sender": "Dave", "text": "https://example.com/doc"},
+        {"sender": "Eve", "text": "https://example.com/doc"},
+    ]
+
+    compacted = compact_messages(messages)
+    texts = [m["text"] for m in compacted]
+
+    expected = [
+        "Release is on Friday\n  Please review PR #234",
+        "+1 ×2",
+        "https://example.com/doc",
+    ]
+
+    if texts != expected or compacted[1]["sender"] != "Bob, Carol":
+        console.print("  [red]✗[/red] Unexpected compaction result")
+        console.print(f"  [dim]{compacted}[/dim]")
+        return False
+
+    # Answers stay next to their questions; long messages differing only at the end are kept
+    answers = [
+        {"sender": "Alice", "text": "Deploy today?"},
+        {"sender": "Bob", "text": "нет"},
+        {"sender": "Alice", "text": "Tomorrow then?"},
+        {"sender": "Dave", "text": "нет"},
+        {"sender": "Bob", "text": "X" * 200 + " meeting at 10"},
+        {"sender": "Carol", "text": "X" * 200 + " meeting cancelled"},
+    ]
+    texts = [m["text"] for m in compact_messages(answers)]
+
+    if texts != [m["text"] for m in answers]:
+        console.print("  [red]✗[/red] Replies moved or distinct messages dropped")
+        console.print(f"  [dim]{texts}[/dim]")
+        return False
+
+    # A long run from one sender must stay splittable by chunk_messages
+    from summarize import MAX_CONTEXT_TOKENS, chunk_messages, estimate_tokens, format_messages_for_llm
+
+    run = [{"sender": "Alice", "text": f"Message {i}: " + "word " * 60} for i in range(100)]
+    chunks = chunk_messages(compact_messages(run))
+    largest = max(estimate_tokens(format_messages_for_llm(chunk, "Test Chat")) for chunk in chunks)
+
+    if len(chunks) < 2 or largest > MAX_CONTEXT_TOKENS + 100:
+        console.print(f"  [red]✗[/red] Same-sender run not split: {len(chunks)} chunks, largest {largest} tokens")
+        return False
+
+    console.print(f"  [green]✓[/green] Compaction works ({len(messages)} → {len(compacted)} messages)")
+    return True
+
+
+def test_summary_cache():
+    """Test summary cache round-trip, expiry and least-recently-used eviction."""
+    console.print("[bold]Test: Summary cache[/bold]")
+
+    import tempfile
+    import summarize
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = summarize.open_cache(Path(tmp) / "cache.sqlite")
+        key = summarize.cache_key("prompt", "model")
+
+        summarize.cache_put(cache, key, "summary")
+        hit = summarize.cache_get(cache, key)
+        miss = summarize.cache_get(cache, summarize.cache_key("prompt", "other-model"))
+
+        cache.execute("UPDATE cache SET ts = ts - ?", (summarize.CACHE_TTL + 1,))
+        expired = summarize.cache_get(cache, key)
+
+        # "old" is older than "new" but was just used, so "new" is evicted first
+        summarize.cache_put(cache, "old", "old summary")
+        summarize.cache_put(cache, "new", "new summary")
+        cache.execute("UPDATE cache SET ts = ts - 10 WHERE key = 'old'")
+        summarize.cache_get(cache, "old")
+        with patch.object(summarize, "CACHE_MAX_ENTRIES", 2):
+            summarize.cache_put(cache, "newest", "newest summary")
+        kept = sorted(row[0] for row in cache.execute("SELECT key FROM cache"))
+        cache.close()
+
+    if hit == "summary" and miss is None and expired is None and kept == ["newest", "old"]:
+        console.print("  [green]✓[/green] Cache hit, miss, expiry and eviction work")
+        return True
+    else:
+        console.print(f"  [red]✗[/red] Unexpected cache results: {hit!r}, {miss!r}, {expired!r}, {kept!r}")
+        return False
+
+
+def test_parse_env():
+    """Test that setup.py reads .env the same way python-dotenv does."""
+    console.print("[bold]Test: .env parsing[/bold]")
+
+    import io
+    from dotenv import dotenv_values
+    import setup
+
+    raw = (
+        "# Telegram API credentials\n"
+        "API_ID=12345 # my id\n"
+        "export API_HASH=ab12\n"
+        "OLLAMA_MODEL='qwen2.5:7b'\n"
+        "NOTE=\"a # b\"  # comment\n"
+    )
+    parsed = setup._parse_env(raw.encode())
+    expected = dict(dotenv_values(stream=io.StringIO(raw)))
+
+    if parsed == expected and parsed["API_ID"] == "12345":
+        console.print("  [green]✓[/green] Comments, quotes and export prefix handled")
+        return True
+    else:
+        console.print(f"  [red]✗[/red] {parsed} != {expected}")
+        return False
+
+
+def test_setup_args():
+    """Test non-interactive setup argument parsing and per-value fallbacks."""
+    console.print("[bold]Test: setup.py arguments[/bold]")
+
+    import setup
+
+    parsed = setup._parse_args(["--api-id", "5", "--api-hash=ab12"])
+
+    try:
+        with patch("sys.stderr"):
+            setup._parse_args(["--api-hash"])
+        missing_rejected = False
+    except SystemExit as e:
+        missing_rejected = e.code == 2
+
+    # Only api_id on argv: api_hash comes from stdin, api_id is not asked again
+    asked = []
+    ask = Mock(side_effect=lambda label: asked.append(label) or "ab12")
+    env = {k: v for k, v in os.environ.items() if k not in ("API_ID", "API_HASH")}
+    with patch.dict(os.environ, env, clear=True), \
+            patch.object(setup, "_probe_config_dir", return_value=(False, True)), \
+            patch.object(setup, "_ask", ask), \
+            patch.object(setup, "save_credentials") as save:
+        setup._main_non_interactive(["--api-id", "5"])
+
+    if parsed == ("5", "ab12") and missing_rejected and asked == ["api_hash"] and save.call_args == (("5", "ab12"),):
+        console.print("  [green]✓[/green] Arguments parsed, missing values filled one by one")
+        return True
+    else:
+        console.print(f"  [red]✗[/red] Unexpected result: {parsed}, {missing_rejected}, {asked}, {save.call_args}")
+        return False
+
+
 def test_cli_help():
     """Test that CLI --help works."""
     console.print("[bold]Test: CLI --help[/bold]")
@@ -253,6 +408,10 @@ def main():
         test_session_file,
         test_chunking,
         test_format_messages,
+        test_compact_messages,
+        test_summary_cache,
+        test_parse_env,
+        test_setup_args,
         test_cli_help,
         test_ollama_generate,
     ]